@@ -0,0 +1,316 @@
+"""
+Config Snapshot Cache for TwoTokens Automation
+Keeps an indexed binary snapshot of config.json so commands only decode the records they use.
+"""
+
+import array
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from datetime import datetime, timedelta, timezone
+
+SNAPSHOT_MAGIC = b"TTSNAP03"
+SNAPSHOT_VERSION = 3
+PREFIX_FORMAT = "<8sQ"
+RECORD_KINDS = ("events", "tasks")
+HEADER_FIELDS = ("key", "sha256", "keys", "values", "sections", "body_length", "body_crc")
+
+class ConfigCache:
+    def __init__(self, config_file="config.json"):
+        self.config_file = config_file
+        config_dir, config_name = os.path.split(os.path.abspath(config_file))
+        self.snapshot_file = os.path.join(config_dir, f".{config_name}.snapshot")
+        self.config = None
+        self.header = None
+        self.body = None
+        self.sections = {}
+
+    def open(self, rebuild=False):
+        """Open the snapshot for the current config file, rebuilding it if stale"""
+        if self.header is not None and not rebuild:
+            return True
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return False
+
+        key = [stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+        snapshot = None if rebuild else self.read_snapshot()
+        if snapshot:
+            header, body, snapshot_mtime_ns = snapshot
+            # A source changed within the same timestamp tick as the snapshot write
+            # can keep its key ("racily clean"), so only trust older sources
+            if header["key"] == key and max(stat.st_mtime_ns, stat.st_ctime_ns) < snapshot_mtime_ns:
+                self.header, self.body = header, body
+                self.sections = {}
+                return True
+
+        with open(self.config_file, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        if snapshot and header["sha256"] == digest and zlib.crc32(body) == header["body_crc"]:
+            # File was touched but not changed, only the key needs refreshing
+            header["key"] = key
+        else:
+            config = json.loads(data)
+            header, body = self.build_snapshot(config)
+            header["sha256"] = digest
+            header["key"] = key
+            # Keep a config a caller already loaded, it may hold unsaved changes
+            if self.config is None:
+                self.config = config
+
+        self.header = header
+        self.body = self.write_snapshot(header, body)
+        self.sections = {}
+        return True
+
+    def load(self):
+        """Load the full configuration, or None if the config file does not exist"""
+        if self.config is None:
+            config = self.read(self._assemble_config)
+            if self.config is None:
+                self.config = config
+        return self.config
+
+    def get_value(self, key, default=None):
+        """Get a top-level config value without decoding any records"""
+        if not self.open():
+            return default
+        return self.header["values"].get(key, default)
+
+    def get_records(self, kind):
+        """Get all records of a kind ("events" or "tasks")"""
+        def read_records():
+            if not self.open() or kind not in self.header["sections"]:
+                return []
+            return self.get_section(kind)
+        return self.read(read_records)
+
+    def get_task(self, name):
+        """Get a task by name, decoding only that record"""
+        return self.read(lambda: self._get_indexed_record("tasks", "task_names", name))
+
+    def get_event(self, event_id):
+        """Get an event by ID, decoding only that record"""
+        return self.read(lambda: self._get_indexed_record("events", "event_ids", event_id))
+
+    def get_event_tasks(self, event_id):
+        """Get the tasks generated for an event, decoding only those records"""
+        def read_event_tasks():
+            if not self.open() or "event_tasks" not in self.header["sections"]:
+                return []
+            indexes = self.get_section("event_tasks", cache=True).get(event_id, [])
+            return [self.get_record("tasks", index) for index in indexes]
+        return self.read(read_event_tasks)
+
+    def get_date(self, value):
+        """Get a pre-parsed event date that is not plain ISO format, or None"""
+        def read_date():
+            if not self.open() or "dates" not in self.header["sections"]:
+                return None
+            fields = self.get_section("dates", cache=True).get(value)
+            if fields is None:
+                return None
+            *parts, utc_offset = fields
+            tzinfo = None if utc_offset is None else timezone(timedelta(seconds=utc_offset))
+            return datetime(*parts, tzinfo=tzinfo)
+        return self.read(read_date)
+
+    def read(self, reader):
+        """Run a snapshot read, rebuilding the snapshot once if it turns out to be damaged"""
+        try:
+            return reader()
+        except (ValueError, EOFError, TypeError, KeyError, IndexError):
+            # The snapshot is only a cache, so damage is a miss rather than an error
+            self.open(rebuild=True)
+            return reader()
+
+    def get_section(self, name, cache=False):
+        """Decode a whole snapshot section"""
+        if name in self.sections:
+            return self.sections[name]
+        offset, length, checksum = self.header["sections"][name]
+        value = marshal.loads(self._get_bytes(offset, length, checksum))
+        if cache:
+            self.sections[name] = value
+        return value
+
+    def get_record(self, kind, index):
+        """Decode a single record through the per-record offset table"""
+        tables_name = f"{kind}_records"
+        if tables_name not in self.sections:
+            offset, length, checksum = self.header["sections"][f"{kind}_offsets"]
+            offsets = self._get_bytes(offset, length, checksum).cast("Q")
+            offset, length, checksum = self.header["sections"][f"{kind}_checksums"]
+            checksums = self._get_bytes(offset, length, checksum).cast("I")
+            self.sections[tables_name] = (offsets, checksums)
+        offsets, checksums = self.sections[tables_name]
+        start, end = offsets[index], offsets[index + 1]
+        return marshal.loads(self._get_bytes(start, end - start, checksums[index]))
+
+    def build_snapshot(self, config):
+        """Encode a config into a snapshot header and body"""
+        body = bytearray()
+        sections = {}
+
+        def add_section(name, data):
+            sections[name] = (len(body), len(data), zlib.crc32(data))
+            body.extend(data)
+
+        values = {}
+        for key, value in config.items():
+            if key in RECORD_KINDS and isinstance(value, list):
+                add_section(key, marshal.dumps(value))
+            else:
+                values[key] = value
+
+        # Each record is also encoded on its own so single lookups skip the rest
+        for kind in RECORD_KINDS:
+            if kind not in sections:
+                continue
+            offsets = array.array("Q")
+            checksums = array.array("I")
+            for record in config[kind]:
+                data = marshal.dumps(record)
+                offsets.append(len(body))
+                checksums.append(zlib.crc32(data))
+                body.extend(data)
+            offsets.append(len(body))
+            add_section(f"{kind}_offsets", offsets.tobytes())
+            add_section(f"{kind}_checksums", checksums.tobytes())
+
+        if "tasks" in sections:
+            task_names = {}
+            event_tasks = {}
+            for index, task in enumerate(config["tasks"]):
+                task_names.setdefault(task.get("name"), index)
+                if task.get("event_id") is not None:
+                    event_tasks.setdefault(task["event_id"], []).append(index)
+            add_section("task_names", marshal.dumps(task_names))
+            add_section("event_tasks", marshal.dumps(event_tasks))
+
+        if "events" in sections:
+            event_ids = {}
+            for index, event in enumerate(config["events"]):
+                event_ids.setdefault(event.get("id"), index)
+            add_section("event_ids", marshal.dumps(event_ids))
+            add_section("dates", marshal.dumps(self.parse_dates(config["events"])))
+
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "keys": list(config.keys()),
+            "values": values,
+            "sections": sections,
+            "body_length": len(body),
+            "body_crc": zlib.crc32(body)
+        }
+        return header, memoryview(bytes(body))
+
+    def parse_dates(self, events):
+        """Pre-parse event dates that need dateutil, keyed by their original value"""
+        # ISO dates (everything create_event stores) parse in microseconds with
+        # datetime.fromisoformat, only hand-edited ones are worth keeping here
+        dates = {}
+        date_parse = None
+        for event in events:
+            for field in ("date", "created"):
+                value = event.get(field)
+                if not isinstance(value, str) or value in dates:
+                    continue
+                try:
+                    datetime.fromisoformat(value)
+                    continue
+                except ValueError:
+                    pass
+
+                if date_parse is None:
+                    try:
+                        from dateutil.parser import parse as date_parse
+                    except ImportError:
+                        return dates
+                try:
+                    parsed = date_parse(value)
+                except (ValueError, OverflowError):
+                    continue
+                utc_offset = parsed.utcoffset()
+                dates[value] = (parsed.year, parsed.month, parsed.day, parsed.hour, parsed.minute,
+                                parsed.second, parsed.microsecond,
+                                None if utc_offset is None else int(utc_offset.total_seconds()))
+        return dates
+
+    def read_snapshot(self):
+        """Read snapshot header and map its body, returning None if missing or unusable"""
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot_mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            magic, header_length = struct.unpack_from(PREFIX_FORMAT, data)
+            prefix_length = struct.calcsize(PREFIX_FORMAT)
+            if magic != SNAPSHOT_MAGIC:
+                return None
+            # marshal only decodes plain data, unlike pickle it never runs code
+            header = marshal.loads(data[prefix_length:prefix_length + header_length])
+        except Exception:
+            return None
+
+        if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+            return None
+        if any(field not in header for field in HEADER_FIELDS):
+            return None
+        body = data[prefix_length + header_length:]
+        # A truncated or padded file is rebuilt before any record is decoded
+        if len(body) != header["body_length"]:
+            return None
+        return header, body, snapshot_mtime_ns
+
+    def write_snapshot(self, header, body):
+        """Atomically write snapshot file, ignoring failures since it is only a cache"""
+        header_data = marshal.dumps(header)
+        prefix = struct.pack(PREFIX_FORMAT, SNAPSHOT_MAGIC, len(header_data))
+        temp_file = None
+        try:
+            fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(self.snapshot_file), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(prefix)
+                f.write(header_data)
+                f.write(body)
+            os.replace(temp_file, self.snapshot_file)
+        except OSError:
+            if temp_file and os.path.exists(temp_file):
+                os.unlink(temp_file)
+        return body
+
+    def _assemble_config(self):
+        """Assemble the full configuration from the snapshot"""
+        if not self.open():
+            return None
+        if self.config is not None:
+            return self.config
+        config = {}
+        for key in self.header["keys"]:
+            if key in self.header["sections"]:
+                config[key] = self.get_section(key)
+            else:
+                config[key] = self.header["values"][key]
+        return config
+
+    def _get_indexed_record(self, kind, index_name, key):
+        """Look up a record through one of the snapshot indexes"""
+        if not self.open() or index_name not in self.header["sections"]:
+            return None
+        index = self.get_section(index_name, cache=True).get(key)
+        return None if index is None else self.get_record(kind, index)
+
+    def _get_bytes(self, offset, length, checksum):
+        """Get a checked slice of the snapshot body"""
+        data = self.body[offset:offset + length]
+        if len(data) != length or zlib.crc32(data) != checksum:
+            raise ValueError("Config snapshot is damaged")
+        return data
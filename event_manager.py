@@ -7,17 +7,31 @@ import json
 import os
 from datetime import datetime, timedelta
 from dateutil.parser import parse as date_parse
+from config_cache import ConfigCache
 
 class EventManager:
-    def __init__(self, config_file="config.json"):
+    def __init__(self, config_file="config.json", config_cache=None):
         self.config_file = config_file
-        self.config = self.load_config()
+        self.config_cache = config_cache or ConfigCache(config_file)
+        self.parsed_dates = {}
+        self._config = None
+    
+    @property
+    def config(self):
+        """Full configuration, loaded on first use"""
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
+    
+    @config.setter
+    def config(self, value):
+        self._config = value
         
     def load_config(self):
         """Load configuration from JSON file"""
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+        config = self.config_cache.load()
+        if config is not None:
+            return config
         return {
             "events": [],
             "event_templates": self.get_default_templates()
@@ -28,6 +42,24 @@ class EventManager:
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=2)
     
+    def parse_date(self, value):
+        """Parse a stored date string, caching the result"""
+        parsed = self.parsed_dates.get(value)
+        if parsed is None:
+            # Dates are stored as ISO strings, hand-edited ones are pre-parsed in the snapshot
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                parsed = self.config_cache.get_date(value) or date_parse(value)
+            self.parsed_dates[value] = parsed
+        return parsed
+    
+    def _get_events(self):
+        """Get all events, decoding them from the snapshot if the config isn't loaded"""
+        if self._config is None:
+            return self.config_cache.get_records("events")
+        return self.config.get("events", [])
+    
     def get_default_templates(self):
         """Get default event task templates"""
         return {
@@ -106,7 +138,7 @@ class EventManager:
     
     def generate_event_tasks(self, event):
         """Generate automatic tasks for an event"""
-        event_date = date_parse(event["date"])
+        event_date = self.parse_date(event["date"])
         templates = self.config.get("event_templates", self.get_default_templates())
         
         # Pre-event tasks
@@ -173,7 +205,7 @@ class EventManager:
     
     def list_events(self, status_filter=None, format_type="detailed", search_term=None):
         """List all events with various formatting and filtering options"""
-        events = self.config.get("events", [])
+        events = self._get_events()
         
         # Apply filters
         if status_filter:
@@ -198,7 +230,7 @@ class EventManager:
             return
         
         # Sort events by date
-        events.sort(key=lambda x: date_parse(x["date"]))
+        events.sort(key=lambda x: self.parse_date(x["date"]))
         
         if format_type == "table":
             self._print_events_table(events)
@@ -213,7 +245,7 @@ class EventManager:
         print("-" * 80)
         
         for event in events:
-            event_date = date_parse(event["date"])
+            event_date = self.parse_date(event["date"])
             name = event["name"][:24] + "..." if len(event["name"]) > 24 else event["name"]
             sponsor_text = event.get("sponsor") or ""
             sponsor = (sponsor_text[:14] + "...") if len(sponsor_text) > 14 else sponsor_text
@@ -226,7 +258,7 @@ class EventManager:
         print(f"Found {len(events)} event(s):\n")
         
         for event in events:
-            event_date = date_parse(event["date"])
+            event_date = self.parse_date(event["date"])
             status_icon = "✅" if event.get("status") == "completed" else "📅" if event.get("status") == "scheduled" else "❓"
             
             print(f"{status_icon} [{event['id']}] {event['name']}")
@@ -243,7 +275,7 @@ class EventManager:
         print("=" * 80)
         
         for i, event in enumerate(events, 1):
-            event_date = date_parse(event["date"])
+            event_date = self.parse_date(event["date"])
             print(f"\n[{i}] Event ID: {event['id']} - {event['name']}")
             print("-" * 50)
             print(f"📅 Date & Time: {event_date.strftime('%A, %B %d, %Y at %H:%M')}")
@@ -286,20 +318,19 @@ class EventManager:
     def _get_event_task_types(self, event_id):
         """Get task types for a specific event"""
         task_types = set()
-        for task in self.config.get("tasks", []):
-            if task.get("event_id") == event_id:
-                task_type = task.get("task_type", "custom")
-                task_types.add(task_type)
+        for task in self._get_event_tasks(event_id):
+            task_type = task.get("task_type", "custom")
+            task_types.add(task_type)
         return sorted(list(task_types))
     
     def view_event(self, event_id):
         """View detailed information about a specific event"""
-        event = self.get_event(event_id)
+        event = self.config_cache.get_event(event_id) if self._config is None else self.get_event(event_id)
         if not event:
             print(f"❌ Event with ID {event_id} not found.")
             return
         
-        event_date = date_parse(event["date"])
+        event_date = self.parse_date(event["date"])
         
         print("=" * 80)
         print(f"EVENT DETAILS - ID: {event['id']}")
@@ -346,7 +377,7 @@ class EventManager:
             print(f"✅ Event completed {days_since} day(s) ago")
         
         if event.get('created'):
-            created_date = date_parse(event['created'])
+            created_date = self.parse_date(event['created'])
             print(f"📅 Created: {created_date.strftime('%Y-%m-%d %H:%M')}")
         print()
         
@@ -387,6 +418,8 @@ class EventManager:
     
     def _get_event_tasks(self, event_id):
         """Get all tasks associated with an event"""
+        if self._config is None:
+            return self.config_cache.get_event_tasks(event_id)
         return [task for task in self.config.get("tasks", []) 
                 if task.get("event_id") == event_id]
     
@@ -474,11 +507,11 @@ class EventManager:
         cutoff_date = datetime.now() + timedelta(days=days_ahead)
         upcoming = []
         
-        for event in self.config.get("events", []):
-            event_date = date_parse(event["date"])
+        for event in self._get_events():
+            event_date = self.parse_date(event["date"])
             if datetime.now() <= event_date <= cutoff_date:
                 upcoming.append(event)
         
         # Sort by date
-        upcoming.sort(key=lambda x: date_parse(x["date"]))
+        upcoming.sort(key=lambda x: self.parse_date(x["date"]))
         return upcoming
\ No newline at end of file
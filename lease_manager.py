@@ -0,0 +1,209 @@
+"""
+Lease Management for TwoTokens Automation
+Coordinates task execution across several hosts through lock directories in a shared store.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+FIRE_TIME_FORMAT = "%Y%m%d%H%M"
+
+class LeaseManager:
+    def __init__(self, lease_dir, lease_ttl=3600, retry_window=86400, retention_days=30):
+        # A missing shared mount must not silently turn into a host-local lease store
+        if not os.path.isdir(lease_dir):
+            raise FileNotFoundError(f"Lease directory not found: {lease_dir}")
+        self.lease_dir = lease_dir
+        self.lease_ttl = lease_ttl
+        self.retry_window = retry_window
+        self.retention_days = retention_days
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    def get_task_path(self, task_name):
+        """Get directory holding all leases for a task"""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', task_name)
+        digest = hashlib.sha1(task_name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.lease_dir, f"{safe_name}-{digest}")
+
+    def get_lease_path(self, task_name, fire_time):
+        """Get directory holding the claims for a (task, fire time) pair"""
+        return os.path.join(self.get_task_path(task_name), fire_time.strftime(FIRE_TIME_FORMAT))
+
+    def get_fire_times(self, task_name):
+        """Get fire times that have a lease for a task, oldest first"""
+        try:
+            names = os.listdir(self.get_task_path(task_name))
+        except FileNotFoundError:
+            return []
+        fire_times = []
+        for name in names:
+            try:
+                fire_times.append(datetime.strptime(name, FIRE_TIME_FORMAT))
+            except ValueError:
+                continue
+        return sorted(fire_times)
+
+    def get_claims(self, lease_path):
+        """Get claim generation numbers for a lease, oldest first"""
+        try:
+            names = os.listdir(lease_path)
+        except FileNotFoundError:
+            return []
+        return sorted(int(name) for name in names if name.isdigit())
+
+    def get_retry_fire_times(self, task_name, fire_time):
+        """Get earlier runs within the retry window that crashed or failed and were never completed"""
+        since = fire_time - timedelta(seconds=self.retry_window)
+        return [earlier for earlier in self.get_fire_times(task_name)
+                if since <= earlier < fire_time and self.is_pending(self.get_lease_path(task_name, earlier))]
+
+    def is_pending(self, lease_path):
+        """Check if a lease has no completed claim and can be claimed now"""
+        claims = self.get_claims(lease_path)
+        if self._is_done(lease_path, claims):
+            return False
+        return not claims or self.is_expired(os.path.join(lease_path, str(claims[-1])))
+
+    def acquire(self, task_name, fire_time):
+        """Claim the lease for a task run, taking over an expired claim if needed"""
+        lease_path = self.get_lease_path(task_name, fire_time)
+        os.makedirs(lease_path, exist_ok=True)
+
+        claims = self.get_claims(lease_path)
+        if self._is_done(lease_path, claims):
+            return None
+        if claims and not self.is_expired(os.path.join(lease_path, str(claims[-1]))):
+            return None
+
+        # Claims are never renamed or removed, so creating the next generation
+        # is the single atomic step that decides the owner, even on NFS
+        generation = claims[-1] + 1 if claims else 0
+        claim_path = os.path.join(lease_path, str(generation))
+        try:
+            os.mkdir(claim_path)
+        except FileExistsError:
+            return None
+
+        now = time.time()
+        lease = {
+            "task": task_name,
+            "fire_time": fire_time.isoformat(),
+            "owner": self.owner,
+            "token": uuid.uuid4().hex,
+            "claimed": now,
+            "expires": now + self.lease_ttl
+        }
+        self._write_lease(claim_path, lease)
+
+        # The previous owner may have finished while we were taking over
+        if self._is_done(lease_path, claims):
+            self._mark(claim_path, "released")
+            return None
+
+        lease["path"] = claim_path
+        return lease
+
+    def renew(self, lease):
+        """Extend a held lease so a long-running task is not taken over"""
+        if not self.owns(lease):
+            return False
+        lease["expires"] = time.time() + self.lease_ttl
+        self._write_lease(lease["path"], {key: value for key, value in lease.items() if key != "path"})
+        return True
+
+    def is_expired(self, claim_path):
+        """Check if a claim can be taken over by another worker"""
+        # Completed runs keep their claim forever so the task never runs twice
+        if os.path.exists(os.path.join(claim_path, "done")):
+            return False
+        if os.path.exists(os.path.join(claim_path, "released")):
+            return True
+
+        try:
+            with open(os.path.join(claim_path, "lease.json"), 'r') as f:
+                expires = float(json.load(f)["expires"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Lease file not written yet (or lost), fall back to directory age
+            try:
+                expires = os.path.getmtime(claim_path) + self.lease_ttl
+            except OSError:
+                return False
+
+        # Epoch seconds, so hosts in different timezones agree on expiry
+        return time.time() >= expires
+
+    def owns(self, lease):
+        """Check if a lease is still held by its claimant"""
+        lease_path, generation = os.path.split(lease["path"])
+        try:
+            with open(os.path.join(lease["path"], "lease.json"), 'r') as f:
+                token = json.load(f).get("token")
+        except (OSError, ValueError):
+            return False
+
+        claims = self.get_claims(lease_path)
+        return token == lease["token"] and bool(claims) and claims[-1] == int(generation)
+
+    def complete(self, lease):
+        """Mark a leased run as finished so no other worker repeats it"""
+        # done goes in before the ownership check so a worker taking over at this
+        # moment sees it in the final check of acquire() and backs off
+        self._mark(lease["path"], "done")
+        return self.owns(lease)
+
+    def release(self, lease):
+        """Give up a lease so a later invocation can retry the run"""
+        # Claims are marked rather than deleted so a generation number is never reused
+        if not self.owns(lease):
+            return False
+        self._mark(lease["path"], "released")
+        return True
+
+    def prune(self, task_name, now=None):
+        """Remove a task's leases older than the retention period"""
+        now = now or datetime.now()
+        # Never prune a run that could still be retried
+        keep_seconds = max(self.retention_days * 86400, self.retry_window)
+        cutoff = now - timedelta(seconds=keep_seconds)
+
+        removed = 0
+        for fire_time in self.get_fire_times(task_name):
+            if fire_time >= cutoff:
+                break
+            lease_path = self.get_lease_path(task_name, fire_time)
+            # rename is atomic, so a half-deleted lease is never seen under its real name
+            pruned_path = f"{lease_path}.pruned-{uuid.uuid4().hex}"
+            try:
+                os.rename(lease_path, pruned_path)
+            except OSError:
+                continue
+            shutil.rmtree(pruned_path, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def _write_lease(self, claim_path, lease):
+        """Atomically write a claim's lease file"""
+        temp_file = os.path.join(claim_path, "lease.json.tmp")
+        with open(temp_file, 'w') as f:
+            json.dump(lease, f, indent=2)
+        os.replace(temp_file, os.path.join(claim_path, "lease.json"))
+
+    def _is_done(self, lease_path, claims):
+        """Check if any claim for a lease has completed"""
+        return any(os.path.exists(os.path.join(lease_path, str(claim), "done")) for claim in claims)
+
+    def _mark(self, claim_path, marker):
+        """Atomically create a marker file inside a claim"""
+        try:
+            fd = os.open(os.path.join(claim_path, marker), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{time.time()}\n")
@@ -0,0 +1,185 @@
+"""
+Tests for the config snapshot cache
+"""
+
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_cache import ConfigCache
+from event_manager import EventManager
+
+loader = importlib.machinery.SourceFileLoader("twotokens", os.path.join(ROOT, "twotokens"))
+spec = importlib.util.spec_from_loader("twotokens", loader)
+twotokens = importlib.util.module_from_spec(spec)
+loader.exec_module(twotokens)
+
+CONFIG = {
+    "twotokens_file": "TwoTokens.md",
+    "log_file": "twotokens.log",
+    "tasks": [
+        {"name": "daily-update", "command": "./twotokens update", "schedule": "0 9 * * *"},
+        {"name": "Meetup_sponsor_reminder", "command": "echo sponsor", "schedule": "0 18 18 7 *", "event_id": 1,
+         "task_type": "pre_event"},
+        {"name": "Meetup_final_reminder", "command": "echo final", "schedule": "0 18 24 7 *", "event_id": 1,
+         "task_type": "pre_event"}
+    ],
+    "settings": {"timezone": "local"},
+    "events": [
+        {"id": 1, "name": "Meetup", "date": "2025-07-25T18:00:00", "status": "scheduled",
+         "tasks": ["Meetup_sponsor_reminder", "Meetup_final_reminder"]}
+    ]
+}
+
+class ConfigCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+        self.write_config(CONFIG)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, config):
+        with open(self.config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    def test_load_round_trips_config(self):
+        ConfigCache(self.config_file).load()
+        config = ConfigCache(self.config_file).load()
+        self.assertEqual(config, CONFIG)
+        self.assertEqual(list(config.keys()), list(CONFIG.keys()))
+
+    def test_lookups_use_snapshot_without_parsing(self):
+        ConfigCache(self.config_file).open()
+        config_cache = ConfigCache(self.config_file)
+
+        self.assertEqual(config_cache.get_value("log_file"), "twotokens.log")
+        self.assertEqual(config_cache.get_task("Meetup_final_reminder")["command"], "echo final")
+        self.assertIsNone(config_cache.get_task("missing"))
+        self.assertEqual(config_cache.get_event(1)["name"], "Meetup")
+        self.assertEqual([task["name"] for task in config_cache.get_event_tasks(1)],
+                         ["Meetup_sponsor_reminder", "Meetup_final_reminder"])
+        self.assertIsNone(config_cache.config)
+
+    def test_same_size_edit_is_detected(self):
+        ConfigCache(self.config_file).open()
+        stat = os.stat(self.config_file)
+
+        changed = json.loads(json.dumps(CONFIG))
+        changed["log_file"] = "twotokens.LOG"
+        self.write_config(changed)
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(os.stat(self.config_file).st_size, stat.st_size)
+
+        self.assertEqual(ConfigCache(self.config_file).get_value("log_file"), "twotokens.LOG")
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        config_cache = ConfigCache(self.config_file)
+        config_cache.open()
+        with open(config_cache.snapshot_file, 'wb') as f:
+            f.write(b"not a snapshot")
+
+        self.assertEqual(ConfigCache(self.config_file).get_event(1)["name"], "Meetup")
+
+    def test_truncated_snapshot_is_rebuilt(self):
+        config_cache = ConfigCache(self.config_file)
+        config_cache.open()
+        size = os.path.getsize(config_cache.snapshot_file)
+        with open(config_cache.snapshot_file, 'r+b') as f:
+            f.truncate(size - 100)
+
+        self.assertEqual(ConfigCache(self.config_file).get_task("daily-update")["command"], "./twotokens update")
+        self.assertEqual(os.path.getsize(config_cache.snapshot_file), size)
+
+    def test_truncated_snapshot_is_rebuilt_after_touch(self):
+        config_cache = ConfigCache(self.config_file)
+        config_cache.open()
+        with open(config_cache.snapshot_file, 'r+b') as f:
+            f.truncate(os.path.getsize(config_cache.snapshot_file) - 100)
+        os.utime(self.config_file)
+
+        self.assertEqual(ConfigCache(self.config_file).get_event(1)["name"], "Meetup")
+        self.assertEqual(ConfigCache(self.config_file).get_event(1)["name"], "Meetup")
+
+    def test_damaged_snapshot_body_is_rebuilt(self):
+        config_cache = ConfigCache(self.config_file)
+        config_cache.open()
+        with open(config_cache.snapshot_file, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last_byte = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last_byte[0] ^ 0xFF]))
+
+        config_cache = ConfigCache(self.config_file)
+        self.assertEqual(config_cache.get_event(1)["name"], "Meetup")
+        self.assertEqual(config_cache.load(), CONFIG)
+        self.assertEqual(ConfigCache(self.config_file).get_event(1)["name"], "Meetup")
+
+    def test_non_iso_dates_are_pre_parsed(self):
+        config = json.loads(json.dumps(CONFIG))
+        config["events"][0]["date"] = "July 25, 2025 6:00 PM"
+        self.write_config(config)
+
+        ConfigCache(self.config_file).open()
+        self.assertEqual(ConfigCache(self.config_file).get_date("July 25, 2025 6:00 PM"),
+                         datetime(2025, 7, 25, 18, 0))
+        self.assertIsNone(ConfigCache(self.config_file).get_date("2025-07-25T18:00:00"))
+
+    def test_missing_config_file(self):
+        config_cache = ConfigCache(os.path.join(self.temp_dir.name, "missing.json"))
+        self.assertIsNone(config_cache.load())
+        self.assertEqual(config_cache.get_records("tasks"), [])
+        self.assertEqual(config_cache.get_value("log_file", "twotokens.log"), "twotokens.log")
+
+class SnapshotManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+        config = json.loads(json.dumps(CONFIG))
+        config["log_file"] = os.path.join(self.temp_dir.name, "twotokens.log")
+        with open(self.config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+        ConfigCache(self.config_file).open()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_managers_read_from_shared_snapshot(self):
+        task_event_manager = twotokens.TaskEventManager(self.config_file)
+        event_mgr = EventManager(self.config_file, task_event_manager.config_cache)
+
+        self.assertEqual(task_event_manager.get_task("daily-update")["schedule"], "0 9 * * *")
+        self.assertEqual(task_event_manager.get_config_value("settings"), {"timezone": "local"})
+        self.assertEqual([event["name"] for event in event_mgr._get_events()], ["Meetup"])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            event_mgr.view_event(1)
+        self.assertIn("Meetup_final_reminder", output.getvalue())
+
+        # Nothing above needed the full configuration
+        self.assertIsNone(task_event_manager._config)
+        self.assertIsNone(event_mgr._config)
+        self.assertIsNone(task_event_manager.config_cache.config)
+
+    def test_saved_event_is_seen_by_next_invocation(self):
+        event_mgr = EventManager(self.config_file)
+        event_mgr.create_event("Launch", "2026-11-02 10:00", sponsor="TechCorp")
+
+        next_event_mgr = EventManager(self.config_file)
+        self.assertEqual([event["name"] for event in next_event_mgr._get_events()], ["Meetup", "Launch"])
+        self.assertEqual(len(next_event_mgr._get_event_tasks(2)), 4)
+        self.assertEqual(twotokens.TaskEventManager(self.config_file).get_task("Launch_final_reminder")["event_id"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for shared-filesystem task leasing
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_manager import LeaseManager
+
+FIRE_TIME = datetime(2026, 10, 19, 9, 0)
+
+class LeaseManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.lease_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_single_winner(self):
+        """Only one of several concurrent workers gets the lease"""
+        results = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            manager = LeaseManager(self.lease_dir)
+            barrier.wait()
+            results.append(manager.acquire("daily-update", FIRE_TIME))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len([lease for lease in results if lease]), 1)
+
+    def test_held_lease_blocks_other_workers(self):
+        self.assertIsNotNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+        self.assertIsNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+
+    def test_expired_lease_is_taken_over(self):
+        self.assertIsNotNone(LeaseManager(self.lease_dir, lease_ttl=0).acquire("daily-update", FIRE_TIME))
+        self.assertIsNotNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+
+    def test_done_blocks_reruns(self):
+        manager = LeaseManager(self.lease_dir, lease_ttl=0)
+        lease = manager.acquire("daily-update", FIRE_TIME)
+        self.assertTrue(manager.complete(lease))
+        self.assertIsNone(LeaseManager(self.lease_dir, lease_ttl=0).acquire("daily-update", FIRE_TIME))
+
+    def test_release_allows_retry(self):
+        manager = LeaseManager(self.lease_dir)
+        self.assertTrue(manager.release(manager.acquire("daily-update", FIRE_TIME)))
+        self.assertIsNotNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+
+    def test_release_after_takeover_keeps_new_owner(self):
+        stale_manager = LeaseManager(self.lease_dir, lease_ttl=0)
+        stale_lease = stale_manager.acquire("daily-update", FIRE_TIME)
+        new_manager = LeaseManager(self.lease_dir)
+        new_lease = new_manager.acquire("daily-update", FIRE_TIME)
+
+        self.assertFalse(stale_manager.release(stale_lease))
+        self.assertTrue(new_manager.owns(new_lease))
+        self.assertIsNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+
+    def test_complete_after_takeover_keeps_new_owner(self):
+        stale_manager = LeaseManager(self.lease_dir, lease_ttl=0)
+        stale_lease = stale_manager.acquire("daily-update", FIRE_TIME)
+        new_manager = LeaseManager(self.lease_dir)
+        new_lease = new_manager.acquire("daily-update", FIRE_TIME)
+
+        self.assertFalse(stale_manager.complete(stale_lease))
+        self.assertFalse(os.path.exists(os.path.join(new_lease["path"], "done")))
+        self.assertTrue(new_manager.complete(new_lease))
+
+    def test_renew_extends_held_lease(self):
+        manager = LeaseManager(self.lease_dir, lease_ttl=0)
+        lease = manager.acquire("daily-update", FIRE_TIME)
+        manager.lease_ttl = 3600
+        self.assertTrue(manager.renew(lease))
+        self.assertIsNone(LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME))
+
+    def test_renew_after_takeover_fails(self):
+        stale_manager = LeaseManager(self.lease_dir, lease_ttl=0)
+        stale_lease = stale_manager.acquire("daily-update", FIRE_TIME)
+        LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME)
+        self.assertFalse(stale_manager.renew(stale_lease))
+
+    def test_crashed_run_is_offered_for_retry(self):
+        # A worker that crashed never completes or releases its lease
+        LeaseManager(self.lease_dir, lease_ttl=0).acquire("daily-update", FIRE_TIME)
+        manager = LeaseManager(self.lease_dir)
+        later = FIRE_TIME.replace(hour=10)
+        self.assertEqual(manager.get_retry_fire_times("daily-update", later), [FIRE_TIME])
+
+        lease = manager.acquire("daily-update", FIRE_TIME)
+        manager.complete(lease)
+        self.assertEqual(manager.get_retry_fire_times("daily-update", later), [])
+
+    def test_retry_is_limited_to_window(self):
+        LeaseManager(self.lease_dir, lease_ttl=0).acquire("daily-update", FIRE_TIME)
+        manager = LeaseManager(self.lease_dir, retry_window=3600)
+        self.assertEqual(manager.get_retry_fire_times("daily-update", FIRE_TIME.replace(hour=11)), [])
+
+    def test_held_run_is_not_offered_for_retry(self):
+        LeaseManager(self.lease_dir).acquire("daily-update", FIRE_TIME)
+        manager = LeaseManager(self.lease_dir)
+        self.assertEqual(manager.get_retry_fire_times("daily-update", FIRE_TIME.replace(hour=10)), [])
+
+    def test_prune_removes_leases_past_retention(self):
+        manager = LeaseManager(self.lease_dir, retry_window=0, retention_days=1)
+        old_time = FIRE_TIME.replace(day=1)
+        manager.complete(manager.acquire("daily-update", old_time))
+        manager.complete(manager.acquire("daily-update", FIRE_TIME))
+
+        self.assertEqual(manager.prune("daily-update", now=FIRE_TIME), 1)
+        self.assertEqual(manager.get_fire_times("daily-update"), [FIRE_TIME])
+
+    def test_fire_times_are_leased_separately(self):
+        manager = LeaseManager(self.lease_dir)
+        self.assertIsNotNone(manager.acquire("daily-update", FIRE_TIME))
+        self.assertIsNotNone(manager.acquire("daily-update", FIRE_TIME.replace(day=20)))
+
+    def test_missing_lease_dir_is_an_error(self):
+        with self.assertRaises(FileNotFoundError):
+            LeaseManager(os.path.join(self.lease_dir, "missing"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Tests for task execution through the TwoTokens CLI
+"""
+
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lease_manager import LeaseManager
+
+loader = importlib.machinery.SourceFileLoader("twotokens", os.path.join(ROOT, "twotokens"))
+spec = importlib.util.spec_from_loader("twotokens", loader)
+twotokens = importlib.util.module_from_spec(spec)
+loader.exec_module(twotokens)
+
+FIRE_TIME = datetime(2026, 10, 19, 9, 0)
+
+class LeasedExecuteTaskTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.lease_dir = os.path.join(self.temp_dir.name, "leases")
+        os.mkdir(self.lease_dir)
+        self.runs_file = os.path.join(self.temp_dir.name, "runs.txt")
+        self.log_file = os.path.join(self.temp_dir.name, "twotokens.log")
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+        self.write_config(self.lease_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, lease_dir):
+        config = {
+            "twotokens_file": os.path.join(self.temp_dir.name, "TwoTokens.md"),
+            "log_file": self.log_file,
+            "tasks": [
+                {"name": "job", "command": f"echo run >> {self.runs_file}", "schedule": "0 9 * * *"},
+                {"name": "broken", "command": f"echo run >> {self.runs_file}; false", "schedule": "0 9 * * *"}
+            ],
+            "settings": {"lease_dir": lease_dir, "lease_ttl": 3600}
+        }
+        with open(self.config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    def execute(self, task_name, fire_time=FIRE_TIME):
+        with contextlib.redirect_stdout(io.StringIO()):
+            twotokens.TaskEventManager(self.config_file).execute_task(task_name, fire_time)
+
+    def run_count(self):
+        if not os.path.exists(self.runs_file):
+            return 0
+        with open(self.runs_file) as f:
+            return len(f.readlines())
+
+    def read_log(self):
+        with open(self.log_file) as f:
+            return f.read()
+
+    def claim_path(self, task_name, fire_time=FIRE_TIME):
+        lease_path = LeaseManager(self.lease_dir).get_lease_path(task_name, fire_time)
+        return os.path.join(lease_path, "0")
+
+    def test_success_completes_lease(self):
+        self.execute("job")
+        self.assertEqual(self.run_count(), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.claim_path("job"), "done")))
+
+        self.execute("job")
+        self.assertEqual(self.run_count(), 1)
+
+    def test_failure_releases_lease(self):
+        self.execute("broken")
+        self.assertEqual(self.run_count(), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.claim_path("broken"), "released")))
+
+    def test_held_lease_skips_run(self):
+        LeaseManager(self.lease_dir).acquire("job", FIRE_TIME)
+        self.execute("job")
+        self.assertEqual(self.run_count(), 0)
+        self.assertIn("leased by another worker", self.read_log())
+
+    def test_crashed_run_is_retried_by_next_invocation(self):
+        # The crashed worker claimed the run and never completed or released it
+        LeaseManager(self.lease_dir, lease_ttl=0).acquire("job", FIRE_TIME)
+
+        self.execute("job", FIRE_TIME.replace(hour=10))
+        self.assertEqual(self.run_count(), 2)
+        self.assertIn("Retrying task 'job' for 2026-10-19 09:00", self.read_log())
+        self.assertFalse(LeaseManager(self.lease_dir).get_retry_fire_times("job", FIRE_TIME.replace(hour=11)))
+
+    def test_failed_run_is_retried_by_next_invocation(self):
+        self.execute("broken")
+        self.execute("broken", FIRE_TIME.replace(hour=10))
+        self.assertEqual(self.run_count(), 3)
+        self.assertIn("Retrying task 'broken' for 2026-10-19 09:00", self.read_log())
+
+    def test_long_running_task_renews_lease(self):
+        with open(self.config_file) as f:
+            config = json.load(f)
+        config["settings"]["lease_ttl"] = 2
+        config["tasks"].append({"name": "slow", "command": "sleep 2.5", "schedule": "0 9 * * *"})
+        with open(self.config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+
+        self.execute("slow")
+        with open(os.path.join(self.claim_path("slow"), "lease.json")) as f:
+            lease = json.load(f)
+        self.assertGreater(lease["expires"] - lease["claimed"], 2)
+
+    def test_missing_lease_dir_skips_run(self):
+        self.write_config(os.path.join(self.temp_dir.name, "not-mounted"))
+        self.execute("job")
+        self.assertEqual(self.run_count(), 0)
+        self.assertIn("Lease directory not found", self.read_log())
+
+    def test_fire_time_option(self):
+        argv = ["twotokens", "--config", self.config_file, "task", "execute", "job", "--fire-time", "2026-10-19 09:00"]
+        with unittest.mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(io.StringIO()):
+            twotokens.main()
+        self.assertEqual(self.run_count(), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.claim_path("job"), "done")))
+
+    def test_invalid_fire_time_option(self):
+        argv = ["twotokens", "--config", self.config_file, "task", "execute", "job", "--fire-time", "tomorrow"]
+        output = io.StringIO()
+        with unittest.mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(output):
+            twotokens.main()
+        self.assertEqual(self.run_count(), 0)
+        self.assertIn("Invalid fire time: tomorrow", output.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()